@@ -0,0 +1,79 @@
+import json
+import sys
+from contextlib import contextmanager
+
+import click
+
+from app.db.session import engine
+from app.services.bulk import BULK_SPECS, FORMATS, import_rows, export_rows, read_rows
+from app.core.profiling import profile_startup
+
+# Usage: python -m app.cli import users partners.ndjson
+#        python -m app.cli export saved-articles - --format csv > saved.csv
+#        python -m app.cli startup-profile app.worker
+
+
+@click.group()
+def cli():
+    """Headlinely admin commands."""
+    # SQL echo goes to stdout and would corrupt exports written to "-"
+    engine.echo = False
+
+
+def _detect_format(path: str, fmt: str) -> str:
+    if fmt:
+        return fmt
+    return "ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv"
+
+
+@contextmanager
+def _open(path: str, mode: str):
+    if path == "-":
+        yield sys.stdin if mode == "r" else sys.stdout
+        return
+    with open(path, mode, newline="", encoding="utf-8") as fp:
+        yield fp
+
+
+@cli.command("import")
+@click.argument("kind", type=click.Choice(sorted(BULK_SPECS)))
+@click.argument("path", type=click.Path(allow_dash=True))
+@click.option("--format", "fmt", type=click.Choice(FORMATS), default=None, help="Defaults to file extension, else csv.")
+def import_command(kind: str, path: str, fmt: str):
+    """Bulk load KIND rows from a CSV/NDJSON file (or - for stdin)."""
+    fmt = _detect_format(path, fmt)
+    with _open(path, "r") as fp, engine.begin() as conn:
+        result = import_rows(conn, kind, read_rows(fp, fmt))
+    click.echo(json.dumps(result), err=True)
+
+
+@cli.command("export")
+@click.argument("kind", type=click.Choice(sorted(BULK_SPECS)))
+@click.argument("path", type=click.Path(allow_dash=True))
+@click.option("--format", "fmt", type=click.Choice(FORMATS), default=None, help="Defaults to file extension, else csv.")
+def export_command(kind: str, path: str, fmt: str):
+    """Stream all KIND rows to a CSV/NDJSON file (or - for stdout)."""
+    fmt = _detect_format(path, fmt)
+    with _open(path, "w") as fp, engine.connect() as conn:
+        count = export_rows(conn, kind, fp, fmt)
+    click.echo(json.dumps({"exported": count}), err=True)
+
+
+@cli.command("startup-profile")
+@click.argument("module", default="app.main")
+@click.option("--top", default=20, show_default=True, help="How many packages/imports to list.")
+def startup_profile_command(module: str, top: int):
+    """Import-time and RSS breakdown for MODULE (app.main for API workers, app.worker for Celery)."""
+    report = profile_startup(module, top=top)
+    click.echo(f"{report['module']}: {report['import_ms']} ms, {report['modules_imported']} modules, "
+               f"peak RSS {report['max_rss_mb']} MB")
+    click.echo("\nSelf time by package:")
+    for row in report["packages"]:
+        click.echo(f"  {row['self_ms']:>9.1f} ms  {row['package']}")
+    click.echo("\nSlowest imports (cumulative):")
+    for row in report["slowest_imports"]:
+        click.echo(f"  {row['cumulative_ms']:>9.1f} ms  {row['module']}")
+
+
+if __name__ == "__main__":
+    cli()
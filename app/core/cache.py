@@ -0,0 +1,461 @@
+import asyncio
+import enum
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import random
+import secrets
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Awaitable, Callable, NamedTuple, Optional
+
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+
+logger = logging.getLogger("app.core.cache")
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
+CACHE_PREFIX = os.getenv("CACHE_PREFIX", "cache")
+CACHE_L1_MAXSIZE = int(os.getenv("CACHE_L1_MAXSIZE", "1024"))
+CACHE_TTL_JITTER = float(os.getenv("CACHE_TTL_JITTER", "0.1"))   # +/- 10% so hot keys don't expire together
+
+INVALIDATION_CHANNEL = f"{CACHE_PREFIX}:invalidate"
+LOCK_TIMEOUT_MS = 10_000       # cross-worker recompute lock, in case the holder dies
+LOCK_WAIT_SECONDS = 2.0        # how long other workers wait for the holder before computing themselves
+LOCK_POLL_SECONDS = 0.05
+LISTENER_RETRY_SECONDS = 1.0
+
+# Delete the lock only if it still holds our token, it may have expired and been taken by another worker
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class _LeaderCancelled(Exception):
+    """
+    The coroutine computing a key was cancelled; coalesced waiters should compute it themselves.
+    """
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    fresh_until: float    # wall clock, shared between workers
+    stale_until: float    # may still be served while one caller refreshes it
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.fresh_until
+
+    def is_expired(self, now: float) -> bool:
+        return now >= self.stale_until
+
+
+class LRUCache:
+    """
+    Size bounded in-process (L1) cache, one per worker.
+    """
+
+    def __init__(self, maxsize: int = CACHE_L1_MAXSIZE):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, CacheEntry]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry.is_expired(time.time()):
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        self._data.pop(key, None)
+
+    def delete_prefix(self, prefix: str):
+        for key in [k for k in self._data if k.startswith(prefix)]:
+            del self._data[key]
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def jittered(ttl: float, jitter: float = CACHE_TTL_JITTER) -> float:
+    return ttl * random.uniform(1 - jitter, 1 + jitter)
+
+
+class TwoTierCache:
+    """
+    L1 (per worker LRU) in front of L2 (Redis).
+
+    - keys are versioned per namespace, bumping the version invalidates the whole namespace
+    - only one coroutine per worker (and, via a Redis lock, usually one worker) recomputes a missing key
+    - entries past their ttl but within stale_ttl are served while a single refresh runs in the background
+    - invalidations are broadcast over pub/sub so every worker drops its L1 copy
+    """
+
+    def __init__(self, redis_url: str = REDIS_URL, prefix: str = CACHE_PREFIX, l1_maxsize: int = CACHE_L1_MAXSIZE):
+        self.redis_url = redis_url
+        self.prefix = prefix
+        self.l1 = LRUCache(l1_maxsize)
+        self.metrics: Counter = Counter()
+        self._redis: Optional[aioredis.Redis] = None
+        self._versions: dict = {}
+        self._inflight: dict = {}
+        self._background: set = set()
+        self._listener: Optional[asyncio.Task] = None
+
+    # --------- Redis helpers ----------
+
+    @property
+    def redis(self) -> aioredis.Redis:
+        if self._redis is None:
+            self._redis = aioredis.from_url(self.redis_url)
+        return self._redis
+
+    def _version_key(self, namespace: str) -> str:
+        return f"{self.prefix}:{namespace}:version"
+
+    async def _version(self, namespace: str) -> int:
+        if namespace not in self._versions:
+            try:
+                raw = await self.redis.get(self._version_key(namespace))
+            except RedisError:
+                # Don't remember the fallback, retry Redis next time
+                self.metrics[(namespace, "l2_errors")] += 1
+                return 0
+            self._versions[namespace] = int(raw or 0)
+        return self._versions[namespace]
+
+    async def _full_key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:v{await self._version(namespace)}:{key}"
+
+    async def _l2_get(self, namespace: str, full_key: str) -> Optional[CacheEntry]:
+        try:
+            raw = await self.redis.get(full_key)
+        except RedisError:
+            self.metrics[(namespace, "l2_errors")] += 1
+            return None
+        if raw is None:
+            return None
+        value, fresh_until, stale_until = json.loads(raw)
+        return CacheEntry(value, fresh_until, stale_until)
+
+    async def _l2_set(self, namespace: str, full_key: str, entry: CacheEntry):
+        try:
+            payload = json.dumps([entry.value, entry.fresh_until, entry.stale_until])
+        except (TypeError, ValueError):
+            # Not JSON friendly, keep it in L1 only
+            logger.debug("Value for %s is not JSON serializable, skipping L2", full_key)
+            return
+        ttl_ms = max(1, int((entry.stale_until - time.time()) * 1000))
+        try:
+            await self.redis.set(full_key, payload, px=ttl_ms)
+        except RedisError:
+            self.metrics[(namespace, "l2_errors")] += 1
+
+    # --------- Reads ----------
+
+    async def get_or_set(
+        self,
+        namespace: str,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: float = 60,
+        stale_ttl: float = 0,
+    ) -> Any:
+        """
+        Return the cached value for (namespace, key), calling `loader` at most once per worker on a miss.
+        """
+        full_key = await self._full_key(namespace, key)
+        now = time.time()
+
+        entry = self.l1.get(full_key)
+        tier = "l1"
+        if entry is None:
+            entry = await self._l2_get(namespace, full_key)
+            tier = "l2"
+            if entry is not None and not entry.is_expired(now):
+                self.l1.set(full_key, entry)
+
+        if entry is not None and not entry.is_expired(now):
+            if entry.is_fresh(now):
+                self.metrics[(namespace, f"hits_{tier}")] += 1
+            else:
+                self.metrics[(namespace, "stale")] += 1
+                self._refresh_in_background(namespace, full_key, loader, ttl, stale_ttl)
+            return entry.value
+
+        self.metrics[(namespace, "misses")] += 1
+        return await self._single_flight(namespace, full_key, loader, ttl, stale_ttl)
+
+    async def _single_flight(self, namespace, full_key, loader, ttl, stale_ttl) -> Any:
+        pending = self._inflight.get(full_key)
+        if pending is not None:
+            self.metrics[(namespace, "coalesced")] += 1
+            try:
+                return await asyncio.shield(pending)
+            except _LeaderCancelled:
+                # Our own task wasn't cancelled, so retry (one of the waiters becomes the new leader)
+                return await self._single_flight(namespace, full_key, loader, ttl, stale_ttl)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = future
+        try:
+            value = await self._load(namespace, full_key, loader, ttl, stale_ttl)
+        except asyncio.CancelledError:
+            # Don't cancel the shared future, that would cancel waiters that were never cancelled
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()   # mark retrieved, there may be no other waiters
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(full_key, None)
+
+    async def _load(self, namespace, full_key, loader, ttl, stale_ttl) -> Any:
+        lock_key = f"{full_key}:lock"
+        token = secrets.token_hex(16)
+        try:
+            # SET NX returns None when somebody else holds the lock
+            locked = bool(await self.redis.set(lock_key, token, nx=True, px=LOCK_TIMEOUT_MS))
+            contended = not locked
+        except RedisError:
+            locked = contended = False
+
+        if contended:
+            # Another worker is computing it, give it a moment to land in L2
+            deadline = time.monotonic() + LOCK_WAIT_SECONDS
+            while time.monotonic() < deadline:
+                await asyncio.sleep(LOCK_POLL_SECONDS)
+                entry = await self._l2_get(namespace, full_key)
+                if entry is not None and not entry.is_expired(time.time()):
+                    self.l1.set(full_key, entry)
+                    return entry.value
+
+        try:
+            value = await loader()
+            self.metrics[(namespace, "loads")] += 1
+            now = time.time()
+            fresh_until = now + jittered(ttl)
+            entry = CacheEntry(value, fresh_until, fresh_until + stale_ttl)
+            self.l1.set(full_key, entry)
+            await self._l2_set(namespace, full_key, entry)
+            return value
+        finally:
+            if locked:
+                try:
+                    await self.redis.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+                except RedisError:
+                    pass
+
+    def _refresh_in_background(self, namespace, full_key, loader, ttl, stale_ttl):
+        if full_key in self._inflight:
+            return
+
+        async def refresh():
+            try:
+                await self._single_flight(namespace, full_key, loader, ttl, stale_ttl)
+            except Exception:
+                logger.exception("Background refresh failed for %s", full_key)
+
+        task = asyncio.create_task(refresh())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    # --------- Invalidation ----------
+
+    async def invalidate(self, namespace: str, key: str):
+        full_key = await self._full_key(namespace, key)
+        self.l1.delete(full_key)
+        try:
+            await self.redis.delete(full_key)
+            await self.redis.publish(INVALIDATION_CHANNEL, f"key:{full_key}")
+        except RedisError:
+            self.metrics[(namespace, "l2_errors")] += 1
+
+    async def invalidate_namespace(self, namespace: str):
+        """
+        Bump the namespace version; old keys are never read again and expire on their own.
+        """
+        self.l1.delete_prefix(f"{self.prefix}:{namespace}:")
+        try:
+            version = await self.redis.incr(self._version_key(namespace))
+            await self.redis.publish(INVALIDATION_CHANNEL, f"ns:{namespace}:{version}")
+        except RedisError:
+            self.metrics[(namespace, "l2_errors")] += 1
+            self._versions.pop(namespace, None)
+            return
+        self._versions[namespace] = version
+
+    def _apply_invalidation(self, message: str):
+        kind, _, rest = message.partition(":")
+        if kind == "key":
+            self.l1.delete(rest)
+        elif kind == "ns":
+            namespace, _, version = rest.rpartition(":")
+            self.l1.delete_prefix(f"{self.prefix}:{namespace}:")
+            try:
+                self._versions[namespace] = int(version)
+            except ValueError:
+                # Re-read the version from Redis on next use
+                self._versions.pop(namespace, None)
+                logger.warning("Bad cache invalidation message: %r", message)
+
+    async def _listen(self):
+        failing = False
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                if failing:
+                    logger.info("Cache invalidation listener reconnected")
+                    failing = False
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        data = message["data"]
+                        self._apply_invalidation(data.decode() if isinstance(data, bytes) else data)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                # Keep listening whatever happened; we may have missed invalidations meanwhile.
+                # Warn once per outage rather than on every retry while Redis is down.
+                if not failing:
+                    logger.warning("Cache invalidation listener failed, reconnecting: %r", exc)
+                    failing = True
+                self.l1.clear()
+                self._versions.clear()
+                await asyncio.sleep(LISTENER_RETRY_SECONDS)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    # --------- Lifecycle / metrics ----------
+
+    async def start(self):
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            # Let it close its pubsub connection before the client goes away
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        background = list(self._background)
+        for task in background:
+            task.cancel()
+        # They may still be using the client (lock release, L2 write)
+        await asyncio.gather(*background, return_exceptions=True)
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    def stats(self) -> dict:
+        """
+        Per namespace counters plus hit ratio (stale serves count as hits).
+        """
+        result: dict = {}
+        for (namespace, name), n in self.metrics.items():
+            result.setdefault(namespace, {})[name] = n
+        for counters in result.values():
+            hits = counters.get("hits_l1", 0) + counters.get("hits_l2", 0) + counters.get("stale", 0)
+            total = hits + counters.get("misses", 0)
+            counters["hit_ratio"] = round(hits / total, 4) if total else 0.0
+        return result
+
+
+cache = TwoTierCache()
+
+
+# Per request objects FastAPI injects; they never change what a call returns
+_INJECTED_TYPES = (Session, Request, Response)
+_KEY_TYPES = (str, int, float, bool, enum.Enum)
+
+
+def _default_key(arguments: dict) -> str:
+    """
+    Build the key from scalar arguments. Anything else could make two different calls
+    share an entry (e.g. one user's data served to another), so it is refused.
+    """
+    parts = []
+    for name, value in sorted(arguments.items()):
+        if isinstance(value, _INJECTED_TYPES):
+            continue
+        if value is not None and not isinstance(value, _KEY_TYPES):
+            raise TypeError(
+                f"@cached can't build a key from argument {name!r} of type {type(value).__name__}; "
+                "pass key= to cached()"
+            )
+        parts.append(f"{name}={value.value if isinstance(value, enum.Enum) else value!r}")
+    key = "&".join(parts) or "_"
+    if len(key) > 200:
+        key = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+    return key
+
+
+def cached(
+    namespace: str,
+    ttl: float = 60,
+    stale_ttl: float = 0,
+    key: Optional[Callable[..., str]] = None,
+    backend: Optional[TwoTierCache] = None,
+):
+    """
+    Cache the result of a route/service function.
+
+        @router.get("/facets")
+        @cached("facets", ttl=60)
+        def article_facets(days: int = 7, db: Session = Depends(get_db)):
+
+    The default key uses scalar arguments only (db sessions, requests and responses are
+    ignored); functions taking anything else, e.g. the current user, must pass key=.
+    Sync functions run in the threadpool on a miss. Don't use stale_ttl with functions that
+    take a request scoped db session: the background refresh runs after the request is done.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        is_async = inspect.iscoroutinefunction(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            cache_key = key(**bound.arguments) if key else _default_key(bound.arguments)
+
+            async def load():
+                if is_async:
+                    return await func(*args, **kwargs)
+                return await run_in_threadpool(func, *args, **kwargs)
+
+            return await (backend or cache).get_or_set(namespace, cache_key, load, ttl=ttl, stale_ttl=stale_ttl)
+
+        return wrapper
+
+    return decorator
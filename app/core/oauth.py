@@ -1,33 +1,43 @@
 import os
-from authlib.integrations.starlette_client import OAuth
-
-# Initialize OAuth
-oauth = OAuth()
+from functools import lru_cache
 
 # GOOGLE (OIDC)
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
 
-if GOOGLE_CLIENT_ID and GOOGLE_CLIENT_SECRET:
-    oauth.register(
-        name="google",
-        client_id=GOOGLE_CLIENT_ID,
-        client_secret=GOOGLE_CLIENT_SECRET,
-        server_metadata_url="https://accounts.google.com/.well-known/openid-configuration",
-        client_kwargs={"scope": "openid email profile"},
-    )
-
 # GITHUB (OAuth2)
 GITHUB_CLIENT_ID = os.getenv("GITHUB_CLIENT_ID")
 GITHUB_CLIENT_SECRET = os.getenv("GITHUB_CLIENT_SECRET")
 
-if GITHUB_CLIENT_ID and GITHUB_CLIENT_SECRET:
-    oauth.register(
-        name="github",
-        client_id=GITHUB_CLIENT_ID,
-        client_secret=GITHUB_CLIENT_SECRET,
-        access_token_url="https://github.com/login/oauth/access_token",
-        authorize_url="https://github.com/login/oauth/authorize",
-        api_base_url="https://api.github.com/",
-        client_kwargs={"scope": "user:email"},
-    )
\ No newline at end of file
+
+@lru_cache(maxsize=None)
+def get_oauth():
+    """
+    Build the OAuth registry on first use, so Authlib (and its crypto deps)
+    is only imported by workers that actually serve an OAuth login.
+    """
+    from authlib.integrations.starlette_client import OAuth
+
+    oauth = OAuth()
+
+    if GOOGLE_CLIENT_ID and GOOGLE_CLIENT_SECRET:
+        oauth.register(
+            name="google",
+            client_id=GOOGLE_CLIENT_ID,
+            client_secret=GOOGLE_CLIENT_SECRET,
+            server_metadata_url="https://accounts.google.com/.well-known/openid-configuration",
+            client_kwargs={"scope": "openid email profile"},
+        )
+
+    if GITHUB_CLIENT_ID and GITHUB_CLIENT_SECRET:
+        oauth.register(
+            name="github",
+            client_id=GITHUB_CLIENT_ID,
+            client_secret=GITHUB_CLIENT_SECRET,
+            access_token_url="https://github.com/login/oauth/access_token",
+            authorize_url="https://github.com/login/oauth/authorize",
+            api_base_url="https://api.github.com/",
+            client_kwargs={"scope": "user:email"},
+        )
+
+    return oauth
@@ -0,0 +1,82 @@
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import NamedTuple
+
+_START_MARKER = "--- profile start ---"
+
+# Runs in a fresh interpreter so nothing is already imported; prints wall time (s) and peak RSS.
+# Interpreter startup and the script's own imports come before the marker and are not counted.
+_CHILD_SCRIPT = f"""
+import resource, sys, time
+sys.stderr.write("{_START_MARKER}\\n")
+sys.stderr.flush()
+start = time.perf_counter()
+# __import__ goes through the C import path that -X importtime instruments, importlib.import_module doesn't
+__import__(sys.argv[1])
+print(time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+# "import time:       123 |       4567 |   sqlalchemy.orm"
+_IMPORTTIME_LINE = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|\s*(\S+)")
+
+
+class ImportTiming(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(output: str) -> list:
+    """
+    Parse -X importtime output, only counting imports after the start marker when present.
+    """
+    _, marker, after = output.partition(_START_MARKER)
+    timings = []
+    for line in (after if marker else output).splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, module = match.groups()
+            timings.append(ImportTiming(module, int(self_us), int(cumulative_us)))
+    return timings
+
+
+def profile_startup(module: str = "app.main", top: int = 20) -> dict:
+    """
+    Import `module` in a clean interpreter with -X importtime and summarize where the time goes:
+    total wall time, peak RSS, self time per top-level package and the slowest individual imports.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD_SCRIPT, module],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    import_seconds, max_rss = proc.stdout.strip().splitlines()[-1].split()
+    # ru_maxrss is in KB on Linux but in bytes on macOS
+    max_rss_kb = int(max_rss) / 1024 if sys.platform == "darwin" else int(max_rss)
+    timings = parse_importtime(proc.stderr)
+
+    by_package = defaultdict(int)
+    for timing in timings:
+        by_package[timing.module.split(".")[0]] += timing.self_us
+
+    slowest = sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:top]
+
+    return {
+        "module": module,
+        "import_ms": round(float(import_seconds) * 1000, 1),
+        "max_rss_mb": round(max_rss_kb / 1024, 1),
+        "modules_imported": len(timings),
+        "packages": [
+            {"package": name, "self_ms": round(us / 1000, 1)}
+            for name, us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+        ],
+        "slowest_imports": [
+            {"module": t.module, "cumulative_ms": round(t.cumulative_us / 1000, 1), "self_ms": round(t.self_us / 1000, 1)}
+            for t in slowest
+        ],
+    }
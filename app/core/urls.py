@@ -0,0 +1,64 @@
+import hashlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query params that only carry tracking info and never change the page content
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid", "ref_src"}
+TRACKING_PREFIXES = ("utm_",)
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def _is_tracking_param(key: str) -> bool:
+    key = key.lower()
+    return key in TRACKING_PARAMS or key.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize an article URL so trivially different links map to the same value.
+    Only used as the input to url_hash, never stored or shown as the article link.
+
+    - scheme is forced to https, host is lowercased, default ports are dropped
+    - tracking params (utm_*, fbclid, ...) are removed, remaining params are sorted
+    - trailing slashes and fragments are dropped
+    - URLs that can't be parsed are only stripped of surrounding whitespace
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        # Malformed (e.g. unbalanced IPv6 bracket, bad port): still give it a stable value
+        return url
+
+    scheme = parts.scheme.lower()
+    if scheme in ("http", "https"):
+        scheme = "https"
+
+    # Work on netloc rather than hostname so userinfo and IPv6 brackets survive
+    userinfo, at, hostport = parts.netloc.rpartition("@")
+    hostport = hostport.lower()
+    if port is not None:
+        # Rebuild from the parsed port so ":0443" and ":443" agree
+        host = hostport[: hostport.rindex(":")]
+        # http and https collapse to one scheme, so either default port is dropped
+        if scheme == "https" and port in DEFAULT_PORTS.values():
+            hostport = host
+        else:
+            hostport = f"{host}:{port}"
+    netloc = f"{userinfo}{at}{hostport}"
+
+    path = parts.path.rstrip("/")
+
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking_param(k)]
+    query.sort()
+
+    return urlunsplit((scheme, netloc, path, urlencode(query), ""))
+
+
+def url_hash(url: str) -> int:
+    """
+    64-bit hash of the canonical URL, as a signed int so it fits a Postgres BIGINT.
+    """
+    digest = hashlib.blake2b(canonicalize_url(url).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
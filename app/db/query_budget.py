@@ -0,0 +1,142 @@
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+logger = logging.getLogger("app.db.query_budget")
+
+# What to do when a route goes over budget: any of "log", "headers", "raise" (comma separated)
+# Production only logs; "headers" exposes DB timing to clients, so enable it (and "raise") in dev/CI only.
+QUERY_BUDGET_MODE = {m.strip() for m in os.getenv("DB_QUERY_BUDGET_MODE", "log").split(",") if m.strip()}
+# Same statement this many times in one request is reported as a likely N+1
+QUERY_REPEAT_THRESHOLD = int(os.getenv("DB_QUERY_REPEAT_THRESHOLD", "5"))
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+class QueryStats:
+    """
+    Statements executed during one request.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.fingerprints = Counter()
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.total_time += elapsed
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: int) -> dict:
+        return {fp: n for fp, n in self.fingerprints.items() if n >= threshold}
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("db_query_stats", default=None)
+
+
+def fingerprint(statement: str) -> str:
+    # SQLAlchemy already sends bound parameters separately, so the text is the shape of the query
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+def instrument_engine(engine: Engine):
+    """
+    Hook statement counting/timing onto the engine. Only records while a request is being tracked.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start_time"].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, time.perf_counter() - start)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        # after_cursor_execute does not fire for failed statements
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start_time"):
+            conn.info["query_start_time"].pop()
+
+
+def query_budget(max_queries: Optional[int] = None, max_repeats: Optional[int] = None):
+    """
+    Declare how many statements a route may run, and how often one statement may repeat.
+
+        @router.get("/me")
+        @query_budget(max_queries=1)
+        def get_me(...):
+    """
+
+    def decorator(func):
+        func.__query_budget__ = {"max_queries": max_queries, "max_repeats": max_repeats}
+        return func
+
+    return decorator
+
+
+def _violations(stats: QueryStats, budget: dict) -> list:
+    problems = []
+    max_queries = budget.get("max_queries")
+    if max_queries is not None and stats.count > max_queries:
+        problems.append(f"{stats.count} statements (budget {max_queries})")
+
+    threshold = budget.get("max_repeats")
+    threshold = QUERY_REPEAT_THRESHOLD if threshold is None else threshold + 1
+    for fp, n in stats.repeated(threshold).items():
+        problems.append(f"statement repeated {n}x (possible N+1): {fp[:200]}")
+    return problems
+
+
+class QueryBudgetMiddleware(BaseHTTPMiddleware):
+    """
+    Tracks statement count and DB time per request and enforces @query_budget.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        try:
+            response = await call_next(request)
+        finally:
+            _current_stats.reset(token)
+
+        # Router fills in the matched endpoint on the shared scope
+        endpoint = request.scope.get("endpoint")
+        budget = getattr(endpoint, "__query_budget__", {})
+        problems = _violations(stats, budget)
+
+        if "headers" in QUERY_BUDGET_MODE:
+            response.headers["X-DB-Query-Count"] = str(stats.count)
+            response.headers["X-DB-Time-Ms"] = f"{stats.total_time * 1000:.2f}"
+
+        if problems:
+            message = f"{request.method} {request.url.path}: " + "; ".join(problems)
+            if "log" in QUERY_BUDGET_MODE:
+                logger.warning("Query budget exceeded: %s", message)
+            if "raise" in QUERY_BUDGET_MODE:
+                raise QueryBudgetExceeded(message)
+
+        return response
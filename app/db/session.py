@@ -1,8 +1,11 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.dialects import postgresql, sqlite
 import os
 
+from app.db.query_budget import instrument_engine
+
 # Load DATABASE_URL from environment
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql+psycopg2://postgres:postgres@db:5432/headlinely")
 
@@ -12,6 +15,9 @@ engine = create_engine(
     echo = True,      # Log SQL queries for development
 )
 
+# Per request statement count / DB time, see QueryBudgetMiddleware
+instrument_engine(engine)
+
 
 # Create a configured "Session" class
 SessionLocal = sessionmaker(
@@ -29,4 +35,12 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def dialect_insert(db: Session):
+    """
+    Dialect specific INSERT (postgres or sqlite) so callers get ON CONFLICT support.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert
+    return postgresql.insert
\ No newline at end of file
@@ -1,8 +1,22 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes.auth import router as auth_router   # 👈 import your auth router
+from app.routes.articles import router as articles_router
+from app.db.query_budget import QueryBudgetMiddleware
+from app.core.cache import cache
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Listen for cache invalidations from other workers
+    await cache.start()
+    yield
+    await cache.close()
 
-app = FastAPI(title = "Headlinely Backend")
+
+app = FastAPI(title = "Headlinely Backend", lifespan = lifespan)
 
 # Allow requests from your frontend (Vite)
 origins = [
@@ -20,7 +34,11 @@ app.add_middleware(
     allow_headers=["*"],            # allow all headers
 )
 
+# Count SQL statements per request and flag N+1 patterns / @query_budget overruns
+app.add_middleware(QueryBudgetMiddleware)
+
 app.include_router(auth_router)
+app.include_router(articles_router)
 
 @app.get("/")
 def root():
@@ -2,4 +2,5 @@ from .user import User
 from .articles import Article
 from .saved_articles import SavedArticle
 from .user_preferences import UserPreference
-from .user_country_preferences import UserCountryPreference
\ No newline at end of file
+from .user_country_preferences import UserCountryPreference
+from .article_facets import ArticleFacetCount
\ No newline at end of file
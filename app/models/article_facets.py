@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Date, PrimaryKeyConstraint
+from app.db.session import Base
+
+
+class ArticleFacetCount(Base):
+    """
+    Pre-aggregated article counts per (day, category, country), maintained on ingest.
+    Unknown category/country are stored as "" so the key never contains NULLs.
+    """
+    __tablename__ = "article_facet_counts"
+
+    day = Column(Date, nullable=False)
+    category = Column(String(20), nullable=False, default="")   # CategoryEnum value, e.g. "business"
+    country = Column(String(5), nullable=False, default="")     # ISO 3166-1 alpha-2 code
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (PrimaryKeyConstraint("day", "category", "country", name="pk_article_facet_counts"),)
+
+    def __repr__(self):
+        return f"<ArticleFacetCount day={self.day} category={self.category} country={self.country} count={self.count}>"
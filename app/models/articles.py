@@ -1,9 +1,10 @@
 import enum
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, Enum, Index
+from sqlalchemy.orm import relationship, validates
 from app.db.session import Base
 from sqlalchemy.sql import func
 from app.models.enums import CategoryEnum
+from app.core.urls import url_hash as compute_url_hash
 
 
 class Article(Base):
@@ -14,7 +15,8 @@ class Article(Base):
     # Basic Metadata
     title = Column(String(500), nullable=False)
     description = Column(Text, nullable=True)
-    url = Column(String(1000), nullable=False, unique=True)
+    url = Column(String(1000), nullable=False)
+    url_hash = Column(BigInteger, nullable=False, unique=True, index=True)  # 64-bit hash of canonical url, used for dedup
     image_url = Column(String(500), nullable=True)
 
     # Category / tags
@@ -28,6 +30,15 @@ class Article(Base):
     # Relationships (for saved articles later)
     saved_by = relationship("SavedArticle", back_populates="article", cascade="all, delete-orphan")
 
+    # Facet reconcile scans recent articles by this expression
+    __table_args__ = (Index("ix_articles_published_or_created", func.coalesce(published_at, created_at)),)
+
+    @validates("url")
+    def _sync_url_hash(self, key, value):
+        # Keep url and url_hash in sync so dedup never depends on callers; url itself is stored as given
+        self.url_hash = compute_url_hash(value)
+        return value
+
     def __repr__(self):
         title_preview = (self.title[:30] + "...") if self.title else "No Title"
         return f"<Article id={self.id} title={title_preview} country={self.country}>"
\ No newline at end of file
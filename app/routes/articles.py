@@ -0,0 +1,24 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.db.query_budget import query_budget
+from app.core.cache import cached
+from app.services.facets import get_facets
+
+router = APIRouter(prefix="/articles", tags=["articles"])
+
+
+# --- Facet counts (per category / country / day), served from pre-aggregated buckets
+@router.get("/facets")
+@query_budget(max_queries=1)
+@cached("facets", ttl=60)
+def article_facets(
+    days: int = Query(7, ge=1, le=90),
+    category: Optional[str] = None,
+    country: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    return get_facets(db, days=days, category=category, country=country)
@@ -9,7 +9,8 @@ from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.models.user import User
 from app.core.security import hash_password, verify_password, create_access_token, decode_access_token
-from app.core.oauth import oauth
+from app.core.oauth import get_oauth
+from app.db.query_budget import query_budget
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -46,6 +47,7 @@ def set_auth_cookie(response: Response, token: str):
 
 # --- Manual Signup
 @router.post("/signup")
+@query_budget(max_queries=4)
 def signup(payload: SignupSchema, response: Response, db: Session = Depends(get_db)):
     existing = db.query(User).filter(User.email == payload.email).first()
     if existing:
@@ -67,6 +69,7 @@ def signup(payload: SignupSchema, response: Response, db: Session = Depends(get_
 
 # --- Manual Login
 @router.post("/login")
+@query_budget(max_queries=1)
 def login(payload: LoginSchema, response: Response, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == payload.email).first()
     if not user or not user.hashed_password:
@@ -82,6 +85,7 @@ def login(payload: LoginSchema, response: Response, db: Session = Depends(get_db
 
 # --------- Get Current User ----------
 @router.get("/me")
+@query_budget(max_queries=1)
 def get_me(access_token: Optional[str] = Cookie(default=None), db: Session=Depends(get_db)):
     if not access_token:
         raise HTTPException(status_code=401, detail="Not Authenticated")
@@ -111,7 +115,7 @@ async def oauth_login(provider: str, request: Request):
     if provider not in ("google", "github"):
         raise HTTPException(status_code=400, detail="Unsupported Provider")
     
-    client = oauth.create_client(provider)
+    client = get_oauth().create_client(provider)
     if not client:
         raise HTTPException(status_code=400, detail=f"{provider} OAuth not configured")
     
@@ -129,7 +133,7 @@ async def oauth_callback(provider: str, request: Request, response: Response, db
     if provider not in ("google", "github"):
         raise HTTPException(status_code=400, detail="Unsupported Provider")
     
-    client = oauth.create_client(provider)
+    client = get_oauth().create_client(provider)
     if not client:
         raise HTTPException(status_code=400, detail=f"{provider} OAuth not configured")
     
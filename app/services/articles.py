@@ -0,0 +1,49 @@
+from typing import Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.db.session import dialect_insert
+from app.core.urls import url_hash
+from app.models.articles import Article
+from app.services.facets import facet_day, facet_key, increment_facets
+
+ARTICLE_FIELDS = ("title", "description", "url", "image_url", "category", "country", "published_at")
+
+
+def get_article_by_url(db: Session, url: str) -> Optional[Article]:
+    """
+    Lookup through the fixed-width url_hash index instead of comparing wide url strings.
+    """
+    return db.query(Article).filter(Article.url_hash == url_hash(url)).first()
+
+
+def ingest_articles(db: Session, items: Iterable[dict]) -> int:
+    """
+    Insert fetched articles, skipping ones we already have (same canonical url),
+    and bump the facet counts for the rows that were actually new.
+    Returns the number of new rows.
+    """
+    rows = {}
+    for item in items:
+        row = {field: item.get(field) for field in ARTICLE_FIELDS}
+        row["url_hash"] = url_hash(row["url"])
+        # Dedup inside the batch too, first one wins
+        rows.setdefault(row["url_hash"], row)
+
+    if not rows:
+        return 0
+
+    stmt = (
+        dialect_insert(db)(Article)
+        .values(list(rows.values()))
+        .on_conflict_do_nothing(index_elements=["url_hash"])
+        .returning(Article.published_at, Article.created_at, Article.category, Article.country)
+    )
+    inserted = db.execute(stmt).all()
+
+    increment_facets(db, (
+        facet_key(facet_day(published_at, created_at), category, country)
+        for published_at, created_at, category, country in inserted
+    ))
+    db.commit()
+    return len(inserted)
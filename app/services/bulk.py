@@ -0,0 +1,338 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from itertools import islice
+from typing import Callable, IO, Iterable, Iterator, NamedTuple, Optional
+
+from sqlalchemy import Select, select, func, cast, String, text
+from sqlalchemy.engine import Connection
+
+from app.core.urls import url_hash
+from app.models.articles import Article
+from app.models.enums import CategoryEnum
+from app.models.saved_articles import SavedArticle
+from app.models.user import User
+from app.models.user_country_preferences import UserCountryPreference
+from app.models.user_preferences import UserPreference
+
+STAGING_TABLE = "bulk_staging"
+CHUNK_SIZE = 5000     # rows per executemany on the non-COPY path
+FORMATS = ("csv", "ndjson")
+
+
+def _blank(value) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _bool(value) -> Optional[bool]:
+    if isinstance(value, bool) or value is None:
+        return value
+    value = str(value).strip().lower()
+    if not value:
+        return None
+    return value in ("1", "true", "t", "yes", "y")
+
+
+def _prepare_user(row: dict) -> Optional[tuple]:
+    email = _blank(row.get("email"))
+    hashed_password = _blank(row.get("hashed_password"))
+    oauth_provider, oauth_id = _blank(row.get("oauth_provider")), _blank(row.get("oauth_id"))
+    # Same rule as ck_user_auth_method
+    if not email or not (hashed_password or (oauth_provider and oauth_id)):
+        return None
+    return (
+        email,
+        hashed_password,
+        _blank(row.get("full_name")),
+        oauth_provider,
+        oauth_id,
+        _bool(row.get("is_active")),
+    )
+
+
+def _prepare_saved_article(row: dict) -> Optional[tuple]:
+    email, url = _blank(row.get("email")), _blank(row.get("url"))
+    if not email or not url:
+        return None
+    # Resolve articles through the url_hash index rather than matching raw url strings
+    return (email, url_hash(url), _blank(row.get("saved_at")))
+
+
+def _prepare_preference(row: dict) -> Optional[tuple]:
+    email, category = _blank(row.get("email")), _blank(row.get("category"))
+    if not email or not category:
+        return None
+    try:
+        # Enum is stored by name in the database
+        return (email, CategoryEnum(category.lower()).name)
+    except ValueError:
+        return None
+
+
+def _prepare_country_preference(row: dict) -> Optional[tuple]:
+    email, country = _blank(row.get("email")), _blank(row.get("country_code"))
+    if not email or not country:
+        return None
+    return (email, country.upper())
+
+
+class BulkSpec(NamedTuple):
+    staging_columns: tuple            # (name, sql type) of the staging table
+    prepare: Callable[[dict], Optional[tuple]]
+    insert_sql: str                   # set based INSERT ... SELECT from the staging table
+    export: Callable[[], Select]       # rows to export, columns match what import expects
+    unresolved_sql: Optional[str] = None   # counts staged rows whose email/url match nothing
+
+
+BULK_SPECS = {
+    "users": BulkSpec(
+        staging_columns=(
+            ("email", "TEXT"), ("hashed_password", "TEXT"), ("full_name", "TEXT"),
+            ("oauth_provider", "TEXT"), ("oauth_id", "TEXT"), ("is_active", "BOOLEAN"),
+        ),
+        prepare=_prepare_user,
+        insert_sql="""
+            INSERT INTO users (email, hashed_password, full_name, oauth_provider, oauth_id, is_active)
+            SELECT s.email, s.hashed_password, s.full_name, s.oauth_provider, s.oauth_id, COALESCE(s.is_active, TRUE)
+            FROM bulk_staging s
+            WHERE TRUE
+            ON CONFLICT DO NOTHING
+        """,
+        export=lambda: select(
+            User.email, User.hashed_password, User.full_name, User.oauth_provider,
+            User.oauth_id, User.is_active, User.created_at,
+        ).order_by(User.id),
+    ),
+    "saved-articles": BulkSpec(
+        staging_columns=(("email", "TEXT"), ("url_hash", "BIGINT"), ("saved_at", "TIMESTAMP WITH TIME ZONE")),
+        prepare=_prepare_saved_article,
+        insert_sql="""
+            INSERT INTO saved_articles (user_id, article_id, saved_at)
+            SELECT u.id, a.id, COALESCE(s.saved_at, CURRENT_TIMESTAMP)
+            FROM bulk_staging s
+            JOIN users u ON u.email = s.email
+            JOIN articles a ON a.url_hash = s.url_hash
+            WHERE TRUE
+            ON CONFLICT DO NOTHING
+        """,
+        export=lambda: select(User.email, Article.url, SavedArticle.saved_at)
+        .join(User, User.id == SavedArticle.user_id)
+        .join(Article, Article.id == SavedArticle.article_id)
+        .order_by(SavedArticle.id),
+        unresolved_sql="""
+            SELECT COUNT(*)
+            FROM bulk_staging s
+            LEFT JOIN users u ON u.email = s.email
+            LEFT JOIN articles a ON a.url_hash = s.url_hash
+            WHERE u.id IS NULL OR a.id IS NULL
+        """,
+    ),
+    "preferences": BulkSpec(
+        staging_columns=(("email", "TEXT"), ("category", "TEXT")),
+        prepare=_prepare_preference,
+        insert_sql="""
+            INSERT INTO user_preferences (user_id, category)
+            SELECT u.id, {category}
+            FROM bulk_staging s
+            JOIN users u ON u.email = s.email
+            WHERE TRUE
+            ON CONFLICT DO NOTHING
+        """,
+        export=lambda: select(User.email, func.lower(cast(UserPreference.category, String)).label("category"))
+        .join(User, User.id == UserPreference.user_id)
+        .order_by(UserPreference.id),
+        unresolved_sql="""
+            SELECT COUNT(*)
+            FROM bulk_staging s
+            LEFT JOIN users u ON u.email = s.email
+            WHERE u.id IS NULL
+        """,
+    ),
+    "country-preferences": BulkSpec(
+        staging_columns=(("email", "TEXT"), ("country_code", "TEXT")),
+        prepare=_prepare_country_preference,
+        insert_sql="""
+            INSERT INTO user_country_preferences (user_id, country_code)
+            SELECT u.id, s.country_code
+            FROM bulk_staging s
+            JOIN users u ON u.email = s.email
+            WHERE TRUE
+            ON CONFLICT DO NOTHING
+        """,
+        export=lambda: select(User.email, UserCountryPreference.country_code)
+        .join(User, User.id == UserCountryPreference.user_id)
+        .order_by(UserCountryPreference.id),
+        unresolved_sql="""
+            SELECT COUNT(*)
+            FROM bulk_staging s
+            LEFT JOIN users u ON u.email = s.email
+            WHERE u.id IS NULL
+        """,
+    ),
+}
+
+
+# --------- Input / output streams ----------
+
+def read_rows(fp: IO[str], fmt: str) -> Iterator[dict]:
+    """
+    Lazily parse CSV (with header) or NDJSON into dicts.
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(fp)
+    else:
+        for line in fp:
+            if line.strip():
+                yield json.loads(line)
+
+
+class CsvPipe:
+    """
+    File-like object that renders rows as CSV on demand, so COPY can pull from a generator
+    without the whole file ever being in memory.
+    """
+
+    def __init__(self, rows: Iterable[tuple]):
+        self._rows = iter(rows)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._pending = ""
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._pending) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._writer.writerow(row)
+            self._pending += self._buffer.getvalue()
+            self._buffer.seek(0)
+            self._buffer.truncate()
+        if size < 0:
+            out, self._pending = self._pending, ""
+        else:
+            out, self._pending = self._pending[:size], self._pending[size:]
+        return out
+
+
+class _ImportTally:
+    """
+    Counts rows flowing through the prepare step (read vs. rejected).
+    """
+
+    def __init__(self):
+        self.read = 0
+        self.rejected = 0
+
+    def prepared(self, rows: Iterable[dict], prepare) -> Iterator[tuple]:
+        for row in rows:
+            self.read += 1
+            prepared = prepare(row)
+            if prepared is None:
+                self.rejected += 1
+                continue
+            yield prepared
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, CategoryEnum):
+        return value.value
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+# --------- Import ----------
+
+def _is_postgres(conn: Connection) -> bool:
+    return conn.dialect.name == "postgresql"
+
+
+def _create_staging(conn: Connection, spec: BulkSpec):
+    columns = ", ".join(f"{name} {sql_type}" for name, sql_type in spec.staging_columns)
+    conn.execute(text(f"DROP TABLE IF EXISTS {STAGING_TABLE}"))
+    conn.execute(text(f"CREATE TEMP TABLE {STAGING_TABLE} ({columns})"))
+
+
+def _copy_into_staging(conn: Connection, spec: BulkSpec, rows: Iterable[tuple]):
+    columns = ", ".join(name for name, _ in spec.staging_columns)
+    # Same DBAPI connection as `conn`, so the temp table and transaction are shared
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {STAGING_TABLE} ({columns}) FROM STDIN WITH (FORMAT csv)", CsvPipe(rows))
+    finally:
+        cursor.close()
+    conn.execute(text(f"ANALYZE {STAGING_TABLE}"))
+
+
+def _insert_into_staging(conn: Connection, spec: BulkSpec, rows: Iterable[tuple]):
+    names = [name for name, _ in spec.staging_columns]
+    stmt = text(f"INSERT INTO {STAGING_TABLE} ({', '.join(names)}) VALUES ({', '.join(':' + n for n in names)})")
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, CHUNK_SIZE))
+        if not chunk:
+            break
+        conn.execute(stmt, [dict(zip(names, row)) for row in chunk])
+
+
+def import_rows(conn: Connection, kind: str, rows: Iterable[dict]) -> dict:
+    """
+    Stage rows (COPY on Postgres, chunked executemany elsewhere) and resolve them into the
+    real tables with one set based INSERT ... SELECT. Existing rows are left untouched.
+    Rows referring to a user or article we don't have are counted as unresolved.
+    Call inside a transaction, e.g. `with engine.begin() as conn`.
+    """
+    spec = BULK_SPECS[kind]
+    tally = _ImportTally()
+    prepared = tally.prepared(rows, spec.prepare)
+
+    _create_staging(conn, spec)
+    if _is_postgres(conn):
+        _copy_into_staging(conn, spec, prepared)
+    else:
+        _insert_into_staging(conn, spec, prepared)
+
+    category = "CAST(s.category AS categoryenum)" if _is_postgres(conn) else "s.category"
+    result = conn.execute(text(spec.insert_sql.format(category=category)))
+    unresolved = conn.execute(text(spec.unresolved_sql)).scalar() if spec.unresolved_sql else 0
+    conn.execute(text(f"DROP TABLE {STAGING_TABLE}"))
+
+    return {"read": tally.read, "rejected": tally.rejected, "unresolved": unresolved, "inserted": result.rowcount}
+
+
+# --------- Export ----------
+
+def export_rows(conn: Connection, kind: str, fp: IO[str], fmt: str) -> int:
+    """
+    Stream a table out as CSV (COPY TO STDOUT on Postgres) or NDJSON. Returns rows written,
+    or -1 when COPY did the writing and did not report a count.
+    """
+    stmt = BULK_SPECS[kind].export()
+
+    if fmt == "csv" and _is_postgres(conn):
+        query = stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true)", fp)
+            return cursor.rowcount
+        finally:
+            cursor.close()
+
+    result = conn.execution_options(stream_results=True, yield_per=CHUNK_SIZE).execute(stmt)
+    columns = list(result.keys())
+    writer = csv.writer(fp) if fmt == "csv" else None
+    if writer:
+        writer.writerow(columns)
+
+    count = 0
+    for row in result:
+        if writer:
+            writer.writerow(row)
+        else:
+            fp.write(json.dumps(dict(zip(columns, row)), default=_json_default) + "\n")
+        count += 1
+    return count
@@ -0,0 +1,136 @@
+from collections import Counter
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import Date, func, text
+from sqlalchemy.orm import Session
+
+from app.db.session import dialect_insert
+from app.models.articles import Article
+from app.models.article_facets import ArticleFacetCount
+from app.models.enums import CategoryEnum
+
+# How far back the periodic reconcile recomputes buckets
+RECONCILE_DAYS = 3
+
+
+def facet_day(published_at: Optional[datetime], created_at: Optional[datetime] = None) -> date:
+    """
+    Bucket day for an article: published date (UTC), falling back to when we stored it.
+    """
+    moment = published_at or created_at or datetime.now(timezone.utc)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return moment.date()
+
+
+def facet_key(day: date, category, country: Optional[str]) -> tuple:
+    if isinstance(category, CategoryEnum):
+        category = category.value
+    return (day, category or "", (country or "").upper())
+
+
+def increment_facets(db: Session, keys: Iterable[tuple]) -> None:
+    """
+    Add one to each (day, category, country) bucket. Runs inside the caller's transaction
+    so counts move together with the article rows.
+    """
+    counts = Counter(keys)
+    if not counts:
+        return
+
+    stmt = dialect_insert(db)(ArticleFacetCount).values([
+        {"day": day, "category": category, "country": country, "count": n}
+        for (day, category, country), n in counts.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["day", "category", "country"],
+        set_={"count": ArticleFacetCount.count + stmt.excluded.count},
+    )
+    db.execute(stmt)
+
+
+def get_facets(db: Session, days: int = 7, category: Optional[str] = None, country: Optional[str] = None) -> dict:
+    """
+    Counts per category, country and day for the last `days` days.
+    Reads only the aggregate buckets, never the articles table.
+    """
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    query = db.query(ArticleFacetCount).filter(ArticleFacetCount.day >= since)
+    if category:
+        query = query.filter(ArticleFacetCount.category == category.lower())
+    if country:
+        query = query.filter(ArticleFacetCount.country == country.upper())
+
+    by_category, by_country, by_day = Counter(), Counter(), Counter()
+    total = 0
+    for bucket in query:
+        if bucket.category:
+            by_category[bucket.category] += bucket.count
+        if bucket.country:
+            by_country[bucket.country] += bucket.count
+        by_day[bucket.day.isoformat()] += bucket.count
+        total += bucket.count
+
+    return {
+        "since": since.isoformat(),
+        "total": total,
+        "categories": dict(by_category.most_common()),
+        "countries": dict(by_country.most_common()),
+        "days": dict(sorted(by_day.items())),
+    }
+
+
+def _day_expr(db: Session, published):
+    if db.get_bind().dialect.name == "postgresql":
+        return func.date(func.timezone("UTC", published), type_=Date)
+    # SQLite (tests) has no time zones and stores datetimes as written, normally UTC
+    return func.date(published, type_=Date)
+
+
+def _aggregate(db: Session, since: date, *criteria) -> Counter:
+    # Range over the raw expression so ix_articles_published_or_created can be used
+    window_start = datetime.combine(since, time.min, tzinfo=timezone.utc)
+    published = func.coalesce(Article.published_at, Article.created_at)
+    day_expr = _day_expr(db, published)
+
+    rows = (
+        db.query(day_expr, Article.category, Article.country, func.count(Article.id))
+        .filter(published >= window_start, *criteria)
+        .group_by(day_expr, Article.category, Article.country)
+        .all()
+    )
+
+    counts = Counter()
+    for day, category, country, n in rows:
+        counts[facet_key(day, category, country)] += n
+    return counts
+
+
+def reconcile_facets(db: Session, days: int = RECONCILE_DAYS) -> int:
+    """
+    Recompute the recent buckets from the articles table and overwrite them.
+    Fixes drift from deletes or writes that bypassed ingest. Returns number of buckets written.
+
+    The aggregate runs without blocking ingest; only the swap of the buckets takes a lock,
+    and articles stored in the meantime (id above what we saw) are added back under it.
+    Articles from transactions still open during the aggregate are picked up by the next run.
+    """
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+
+    seen_max_id = db.query(func.max(Article.id)).scalar() or 0
+    counts = _aggregate(db, since, Article.id <= seen_max_id)
+
+    # Make concurrent ingests wait on their increments until we commit, so none are lost or double counted
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE article_facet_counts IN SHARE ROW EXCLUSIVE MODE"))
+    counts.update(_aggregate(db, since, Article.id > seen_max_id))
+
+    db.query(ArticleFacetCount).filter(ArticleFacetCount.day >= since).delete(synchronize_session=False)
+    if counts:
+        db.execute(ArticleFacetCount.__table__.insert(), [
+            {"day": day, "category": category, "country": country, "count": n}
+            for (day, category, country), n in counts.items()
+        ])
+    db.commit()
+    return len(counts)
@@ -0,0 +1,27 @@
+import os
+from celery import Celery
+
+from app.db.session import SessionLocal
+from app.services.facets import reconcile_facets
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
+FACET_RECONCILE_SECONDS = int(os.getenv("FACET_RECONCILE_SECONDS", "3600"))
+
+# Run with: celery -A app.worker worker -B
+celery_app = Celery("headlinely", broker=REDIS_URL)
+
+celery_app.conf.beat_schedule = {
+    "reconcile-article-facets": {
+        "task": "app.worker.reconcile_article_facets",
+        "schedule": FACET_RECONCILE_SECONDS,
+    },
+}
+
+
+@celery_app.task(name="app.worker.reconcile_article_facets")
+def reconcile_article_facets():
+    db = SessionLocal()
+    try:
+        return reconcile_facets(db)
+    finally:
+        db.close()
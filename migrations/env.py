@@ -39,6 +39,7 @@ from app.models.articles import Article
 from app.models.saved_articles import SavedArticle
 from app.models.user_preferences import UserPreference
 from app.models.user_country_preferences import UserCountryPreference
+from app.models.article_facets import ArticleFacetCount
 
 # this is the Alembic Config object
 config = context.config
@@ -0,0 +1,55 @@
+"""add article_facet_counts aggregate table
+
+Revision ID: 529c6684ba28
+Revises: 708f7e5c9d1b
+Create Date: 2026-10-19 11:40:07.918233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '529c6684ba28'
+down_revision: Union[str, Sequence[str], None] = '708f7e5c9d1b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('article_facet_counts',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('category', sa.String(length=20), nullable=False),
+    sa.Column('country', sa.String(length=5), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'category', 'country', name='pk_article_facet_counts')
+    )
+
+    # Build without the SHARE lock a plain CREATE INDEX holds, so ingest keeps writing
+    with op.get_context().autocommit_block():
+        # A failed CONCURRENTLY build leaves an INVALID index behind
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_articles_published_or_created")
+        op.create_index(
+            'ix_articles_published_or_created', 'articles',
+            [sa.text('COALESCE(published_at, created_at)')], unique=False, postgresql_concurrently=True,
+        )
+
+    # Seed buckets from existing articles (same bucketing as app.services.facets)
+    op.execute("""
+        INSERT INTO article_facet_counts (day, category, country, count)
+        SELECT DATE(timezone('UTC', COALESCE(published_at, created_at))),
+               COALESCE(LOWER(category::text), ''),
+               COALESCE(UPPER(country), ''),
+               COUNT(*)
+        FROM articles
+        GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_articles_published_or_created', table_name='articles')
+    op.drop_table('article_facet_counts')
@@ -0,0 +1,121 @@
+"""add articles.url_hash for canonical url dedup
+
+Revision ID: 708f7e5c9d1b
+Revises: e0935e2fd3f8
+Create Date: 2026-10-19 10:12:31.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.urls import url_hash
+
+
+# revision identifiers, used by Alembic.
+revision: str = '708f7e5c9d1b'
+down_revision: Union[str, Sequence[str], None] = 'e0935e2fd3f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+
+def _backfill(connection) -> None:
+    """Fill url_hash in id ordered batches, each batch commits on its own.
+
+    url values are left as they are; only the hash is computed from the canonical form.
+    """
+    select_batch = sa.text(
+        "SELECT id, url FROM articles WHERE id > :last_id AND url_hash IS NULL ORDER BY id LIMIT :limit"
+    )
+    update_row = sa.text("UPDATE articles SET url_hash = :url_hash WHERE id = :id")
+
+    last_id = 0
+    while True:
+        rows = connection.execute(select_batch, {"last_id": last_id, "limit": BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        params = [{"id": row_id, "url_hash": url_hash(url)} for row_id, url in rows]
+        connection.execute(update_row, params)
+        last_id = rows[-1][0]
+
+
+def _merge_duplicates(connection) -> None:
+    """Rows that only differed by tracking params/scheme/etc now share a hash: keep the oldest."""
+    connection.execute(sa.text("DROP TABLE IF EXISTS article_dupes"))
+    connection.execute(sa.text("""
+        CREATE TEMP TABLE article_dupes AS
+        SELECT id, keep_id FROM (
+            SELECT id, MIN(id) OVER (PARTITION BY url_hash) AS keep_id FROM articles
+        ) ranked
+        WHERE id <> keep_id
+    """))
+    # A user may have saved the kept article and/or several of its duplicates:
+    # keep only their earliest save per kept article so the move below can't hit uq_user_article
+    connection.execute(sa.text("""
+        DELETE FROM saved_articles WHERE id IN (
+            SELECT id FROM (
+                SELECT s.id,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY s.user_id, COALESCE(d.keep_id, s.article_id)
+                           ORDER BY s.saved_at, s.id
+                       ) AS rn
+                FROM saved_articles s
+                LEFT JOIN article_dupes d ON d.id = s.article_id
+                WHERE s.article_id IN (SELECT id FROM article_dupes UNION SELECT keep_id FROM article_dupes)
+            ) ranked
+            WHERE rn > 1
+        )
+    """))
+    connection.execute(sa.text("""
+        UPDATE saved_articles s
+        SET article_id = d.keep_id
+        FROM article_dupes d
+        WHERE s.article_id = d.id
+    """))
+    connection.execute(sa.text("DELETE FROM articles a USING article_dupes d WHERE a.id = d.id"))
+    connection.execute(sa.text("DROP TABLE article_dupes"))
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Everything up to the NOT NULL check runs in autocommit and is safe to rerun
+    if a previous attempt failed half way.
+    """
+    op.execute("ALTER TABLE articles ADD COLUMN IF NOT EXISTS url_hash BIGINT")
+
+    # Run outside the migration transaction so every batch releases its row locks right away
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        _backfill(connection)
+        _merge_duplicates(connection)
+
+        # A failed CONCURRENTLY build leaves an INVALID index behind
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_articles_url_hash")
+        op.create_index(
+            op.f('ix_articles_url_hash'), 'articles', ['url_hash'],
+            unique=True, postgresql_concurrently=True,
+        )
+
+        # ADD ... NOT VALID is instant; VALIDATE then scans under SHARE UPDATE EXCLUSIVE only,
+        # each in its own commit so the ACCESS EXCLUSIVE lock from ADD isn't held during the scan
+        op.execute("ALTER TABLE articles DROP CONSTRAINT IF EXISTS ck_articles_url_hash_not_null")
+        op.execute("ALTER TABLE articles ADD CONSTRAINT ck_articles_url_hash_not_null CHECK (url_hash IS NOT NULL) NOT VALID")
+        op.execute("ALTER TABLE articles VALIDATE CONSTRAINT ck_articles_url_hash_not_null")
+
+    # The validated CHECK lets SET NOT NULL skip the table scan, so these are all cheap
+    op.alter_column('articles', 'url_hash', nullable=False)
+    op.drop_constraint('ck_articles_url_hash_not_null', 'articles', type_='check')
+
+    # The wide unique index on url is no longer used for conflict detection
+    op.drop_constraint('articles_url_key', 'articles', type_='unique')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_unique_constraint('articles_url_key', 'articles', ['url'])
+    op.drop_index(op.f('ix_articles_url_hash'), table_name='articles')
+    op.drop_column('articles', 'url_hash')
@@ -0,0 +1,6 @@
+import os
+
+# Models import app.db.session, which builds an engine from DATABASE_URL at import time
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+# Over budget routes fail the tests instead of only logging
+os.environ.setdefault("DB_QUERY_BUDGET_MODE", "log,headers,raise")
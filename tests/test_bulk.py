@@ -0,0 +1,147 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, select
+
+from app.db.session import Base
+from app.models import Article, SavedArticle, User
+from app.services.bulk import CsvPipe, export_rows, import_rows, read_rows
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def test_import_users_counts_rejected_rows(engine):
+    rows = [
+        {"email": "a@example.com", "hashed_password": "x"},
+        {"email": "b@example.com", "oauth_provider": "github", "oauth_id": "1"},
+        {"email": "c@example.com"},                                   # no way to log in
+        {"email": "d@example.com", "oauth_provider": "github"},       # half an OAuth identity
+        {"email": "", "hashed_password": "x"},
+        {"email": "a@example.com", "hashed_password": "y"},           # already imported above
+    ]
+    with engine.begin() as conn:
+        result = import_rows(conn, "users", rows)
+
+    assert result == {"read": 6, "rejected": 3, "unresolved": 0, "inserted": 2}
+    with engine.connect() as conn:
+        assert sorted(conn.scalars(select(User.email))) == ["a@example.com", "b@example.com"]
+
+
+def test_import_saved_articles_resolves_email_and_url(engine):
+    with engine.begin() as conn:
+        import_rows(conn, "users", [{"email": "a@example.com", "hashed_password": "x"}])
+        conn.execute(Article.__table__.insert(), [{
+            "title": "t", "url": "https://example.com/story",
+            "url_hash": Article(url="https://example.com/story").url_hash,
+        }])
+        result = import_rows(conn, "saved-articles", [
+            {"email": "a@example.com", "url": "http://example.com/story/?utm_source=x"},
+            {"email": "a@example.com", "url": "https://example.com/unknown"},
+            {"email": "nobody@example.com", "url": "https://example.com/story"},
+        ])
+
+    assert result == {"read": 3, "rejected": 0, "unresolved": 2, "inserted": 1}
+    with engine.connect() as conn:
+        assert conn.execute(select(SavedArticle.user_id, SavedArticle.article_id)).all() == [(1, 1)]
+
+
+def test_import_preferences_counts_unknown_users_as_unresolved(engine):
+    with engine.begin() as conn:
+        import_rows(conn, "users", [{"email": "a@example.com", "hashed_password": "x"}])
+        result = import_rows(conn, "country-preferences", [
+            {"email": "a@example.com", "country_code": "us"},
+            {"email": "nobody@example.com", "country_code": "gb"},
+            {"email": "a@example.com", "country_code": ""},
+        ])
+
+    assert result == {"read": 3, "rejected": 1, "unresolved": 1, "inserted": 1}
+
+
+def test_csv_pipe_reads_across_row_boundaries():
+    rows = [("a@example.com", None, True), ("b,c@example.com", "x", False)] * 3
+    expected = "a@example.com,,True\r\n\"b,c@example.com\",x,False\r\n" * 3
+
+    pipe = CsvPipe(rows)
+    chunks = []
+    while chunk := pipe.read(7):
+        assert len(chunk) <= 7
+        chunks.append(chunk)
+    assert "".join(chunks) == expected
+    assert CsvPipe(rows).read() == expected
+    assert CsvPipe([]).read(10) == ""
+
+
+def test_csv_pipe_renders_only_what_is_read():
+    pulled = []
+
+    def rows():
+        for i in range(100):
+            pulled.append(i)
+            yield (i,)
+
+    pipe = CsvPipe(rows())
+    assert pipe.read(4) == "0\r\n1"
+    assert pulled == [0, 1]
+
+
+@pytest.fixture
+def seeded(engine):
+    with engine.begin() as conn:
+        import_rows(conn, "users", [
+            {"email": "a@example.com", "hashed_password": "x", "full_name": "A"},
+            {"email": "b@example.com", "oauth_provider": "github", "oauth_id": "1", "is_active": "false"},
+        ])
+        import_rows(conn, "preferences", [
+            {"email": "a@example.com", "category": "Sports"},
+            {"email": "b@example.com", "category": "health"},
+        ])
+    return engine
+
+
+def test_export_users_as_csv(seeded):
+    fp = io.StringIO()
+    with seeded.connect() as conn:
+        assert export_rows(conn, "users", fp, "csv") == 2
+
+    fp.seek(0)
+    rows = list(csv.DictReader(fp))
+    assert [(r["email"], r["full_name"], r["oauth_id"], r["is_active"]) for r in rows] == [
+        ("a@example.com", "A", "", "True"),
+        ("b@example.com", "", "1", "False"),
+    ]
+    assert rows[0]["created_at"]
+
+
+def test_export_ndjson_round_trips_through_import(seeded, engine):
+    fp = io.StringIO()
+    with seeded.connect() as conn:
+        assert export_rows(conn, "preferences", fp, "ndjson") == 2
+
+    lines = [json.loads(line) for line in fp.getvalue().splitlines()]
+    assert lines == [
+        {"email": "a@example.com", "category": "sports"},
+        {"email": "b@example.com", "category": "health"},
+    ]
+
+    fp.seek(0)
+    with engine.begin() as conn:
+        result = import_rows(conn, "preferences", read_rows(fp, "ndjson"))
+    assert result == {"read": 2, "rejected": 0, "unresolved": 0, "inserted": 0}
+
+
+def test_export_ndjson_serializes_datetimes(seeded):
+    fp = io.StringIO()
+    with seeded.connect() as conn:
+        export_rows(conn, "users", fp, "ndjson")
+
+    first = json.loads(fp.getvalue().splitlines()[0])
+    assert first["email"] == "a@example.com" and first["is_active"] is True
+    assert datetime.fromisoformat(first["created_at"])
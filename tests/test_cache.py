@@ -0,0 +1,367 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core import cache as cache_module
+from app.core.cache import CacheEntry, LRUCache, TwoTierCache, _default_key, cached
+
+
+class FakeRedis:
+    """
+    Just enough of redis.asyncio for the cache: strings, NX locks, counters, publish.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.published = []
+        self.pubsubs = []
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def delete(self, key):
+        return 1 if self.data.pop(key, None) is not None else 0
+
+    async def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+    async def eval(self, script, numkeys, key, token):
+        # Only the lock release script is used
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+    async def aclose(self):
+        pass
+
+    def pubsub(self):
+        pubsub = self.next_pubsub()
+        self.pubsubs.append(pubsub)
+        return pubsub
+
+
+def make_cache(**kwargs):
+    backend = TwoTierCache(**kwargs)
+    backend._redis = FakeRedis()
+    return backend
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+# --------- L1 ----------
+
+def test_lru_cache_evicts_least_recently_used():
+    lru = LRUCache(maxsize=2)
+    entry = CacheEntry("v", time.time() + 60, time.time() + 60)
+    lru.set("a", entry)
+    lru.set("b", entry)
+    lru.get("a")
+    lru.set("c", entry)
+    assert lru.get("a") is not None
+    assert lru.get("b") is None
+    assert len(lru) == 2
+
+
+def test_lru_cache_drops_expired_entries():
+    lru = LRUCache()
+    lru.set("a", CacheEntry("v", time.time() - 2, time.time() - 1))
+    assert lru.get("a") is None
+    assert len(lru) == 0
+
+
+def test_default_key_skips_injected_arguments():
+    assert _default_key({"days": 7, "country": None, "db": Session()}) == "country=None&days=7"
+    assert len(_default_key({"q": "x" * 500})) == 32
+
+
+def test_default_key_refuses_non_scalar_arguments():
+    with pytest.raises(TypeError, match="pass key="):
+        _default_key({"user": {"id": 1}})
+
+
+# --------- get_or_set ----------
+
+def test_concurrent_misses_call_loader_once():
+    backend = make_cache()
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"n": 1}
+
+    async def main():
+        return await asyncio.gather(*[backend.get_or_set("ns", "k", loader) for _ in range(10)])
+
+    assert run(main()) == [{"n": 1}] * 10
+    assert calls == 1
+    stats = backend.stats()["ns"]
+    assert stats["loads"] == 1
+    assert stats["coalesced"] == 9
+
+
+def test_hits_come_from_l1_then_l2():
+    backend = make_cache()
+
+    async def loader():
+        return "value"
+
+    async def main():
+        await backend.get_or_set("ns", "k", loader)
+        await backend.get_or_set("ns", "k", loader)
+        backend.l1.clear()
+        await backend.get_or_set("ns", "k", loader)
+
+    run(main())
+    stats = backend.stats()["ns"]
+    assert stats["misses"] == 1
+    assert stats["hits_l1"] == 1
+    assert stats["hits_l2"] == 1
+    assert stats["hit_ratio"] == round(2 / 3, 4)
+
+
+def test_stale_value_is_served_while_refreshing():
+    backend = make_cache()
+    values = iter(["old", "new"])
+
+    async def loader():
+        return next(values)
+
+    async def main():
+        await backend.get_or_set("ns", "k", loader, ttl=60, stale_ttl=60)
+        # Age the entry past its ttl but within stale_ttl
+        for full_key, entry in list(backend.l1._data.items()):
+            backend.l1.set(full_key, entry._replace(fresh_until=time.time() - 1))
+        stale = await backend.get_or_set("ns", "k", loader, ttl=60, stale_ttl=60)
+        await asyncio.gather(*backend._background)
+        fresh = await backend.get_or_set("ns", "k", loader, ttl=60, stale_ttl=60)
+        return stale, fresh
+
+    assert run(main()) == ("old", "new")
+    assert backend.stats()["ns"]["stale"] == 1
+
+
+def test_cancelled_leader_does_not_cancel_waiters():
+    backend = make_cache()
+
+    async def main():
+        first_call = asyncio.Event()
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                first_call.set()
+                await asyncio.sleep(10)
+            return "value"
+
+        leader = asyncio.create_task(backend.get_or_set("ns", "k", loader))
+        await first_call.wait()
+        waiter = asyncio.create_task(backend.get_or_set("ns", "k", loader))
+        await asyncio.sleep(0)
+        leader.cancel()
+        result = await waiter
+        assert leader.cancelled()
+        return result, calls
+
+    assert run(main()) == ("value", 2)
+
+
+def test_lock_release_keeps_other_workers_lock():
+    backend = make_cache()
+    redis = backend._redis
+
+    async def loader():
+        # Our lock expired and another worker took it meanwhile
+        for key in [k for k in redis.data if k.endswith(":lock")]:
+            redis.data[key] = "someone-else"
+        return "value"
+
+    run(backend.get_or_set("ns", "k", loader))
+    assert [v for k, v in redis.data.items() if k.endswith(":lock")] == ["someone-else"]
+
+
+# --------- Invalidation ----------
+
+def test_invalidate_namespace_bumps_version_and_broadcasts():
+    backend = make_cache()
+    values = iter(["v1", "v2"])
+
+    async def loader():
+        return next(values)
+
+    async def main():
+        first = await backend.get_or_set("ns", "k", loader)
+        await backend.invalidate_namespace("ns")
+        second = await backend.get_or_set("ns", "k", loader)
+        return first, second
+
+    assert run(main()) == ("v1", "v2")
+    assert backend._redis.published == [(cache_module.INVALIDATION_CHANNEL, "ns:ns:1")]
+
+
+def test_invalidation_messages_drop_l1_entries():
+    backend = make_cache()
+    entry = CacheEntry("v", time.time() + 60, time.time() + 60)
+    backend.l1.set("cache:ns:v0:a", entry)
+    backend.l1.set("cache:ns:v0:b", entry)
+    backend.l1.set("cache:other:v0:a", entry)
+
+    backend._apply_invalidation("key:cache:ns:v0:a")
+    assert backend.l1.get("cache:ns:v0:a") is None
+    assert backend.l1.get("cache:ns:v0:b") is not None
+
+    backend._apply_invalidation("ns:ns:3")
+    assert backend._versions["ns"] == 3
+    assert backend.l1.get("cache:ns:v0:b") is None
+    assert backend.l1.get("cache:other:v0:a") is not None
+
+    backend._apply_invalidation("ns:ns:garbage")
+    assert "ns" not in backend._versions
+
+
+class FakePubSub:
+    def __init__(self, messages, error=None):
+        self.messages = messages
+        self.error = error
+        self.closed = False
+
+    async def subscribe(self, channel):
+        pass
+
+    async def listen(self):
+        for message in self.messages:
+            yield message
+        if self.error:
+            raise self.error
+        await asyncio.sleep(10)
+
+    async def aclose(self):
+        self.closed = True
+
+
+def test_listener_reconnects_after_any_error(monkeypatch):
+    monkeypatch.setattr(cache_module, "LISTENER_RETRY_SECONDS", 0)
+    backend = make_cache()
+    entry = CacheEntry("v", time.time() + 60, time.time() + 60)
+    backend.l1.set("cache:ns:v0:a", entry)
+    backend.l1.set("cache:ns:v0:b", entry)
+
+    pubsubs = iter([
+        FakePubSub([], error=ValueError("boom")),
+        FakePubSub([{"type": "message", "data": b"ns:ns:5"}]),
+    ])
+    backend._redis.next_pubsub = lambda: next(pubsubs)
+
+    async def main():
+        await backend.start()
+        for _ in range(50):
+            await asyncio.sleep(0)
+        await backend.close()
+
+    redis = backend._redis
+    run(main())
+    first, second = redis.pubsubs
+    assert first.closed and second.closed
+    # The failure cleared L1, the second connection kept processing messages
+    assert len(backend.l1) == 0
+    assert backend._versions == {"ns": 5}
+    assert backend._listener is None
+
+
+# --------- Decorator ----------
+
+def test_cached_decorator_wraps_sync_functions():
+    backend = make_cache()
+    calls = []
+
+    @cached("facets", ttl=60, backend=backend)
+    def facets(days: int = 7, db=None):
+        calls.append(days)
+        return {"days": days}
+
+    async def main():
+        return [await facets(days=7, db=Session()), await facets(days=7, db=Session()), await facets(days=3)]
+
+    assert run(main()) == [{"days": 7}, {"days": 7}, {"days": 3}]
+    assert calls == [7, 3]
+
+
+def test_calls_differing_in_non_scalar_argument_do_not_collide():
+    backend = make_cache()
+
+    @cached("me", backend=backend)
+    def profile(user, tags=None):
+        return {"name": user["name"]}
+
+    @cached("me-keyed", backend=backend, key=lambda user, tags=None: str(user["id"]))
+    def keyed_profile(user, tags=None):
+        return {"name": user["name"]}
+
+    async def main():
+        with pytest.raises(TypeError):
+            await profile({"id": 1, "name": "alice"})
+        alice = await keyed_profile({"id": 1, "name": "alice"})
+        bob = await keyed_profile({"id": 2, "name": "bob"})
+        return alice, bob
+
+    assert run(main()) == ({"name": "alice"}, {"name": "bob"})
+
+
+def test_listener_warns_once_while_redis_is_down(monkeypatch, caplog):
+    monkeypatch.setattr(cache_module, "LISTENER_RETRY_SECONDS", 0)
+    backend = make_cache()
+
+    class DownPubSub(FakePubSub):
+        async def subscribe(self, channel):
+            raise ConnectionError("redis is down")
+
+    pubsubs = iter([DownPubSub([]) for _ in range(5)] + [FakePubSub([])])
+    backend._redis.next_pubsub = lambda: next(pubsubs)
+
+    async def main():
+        await backend.start()
+        for _ in range(50):
+            await asyncio.sleep(0)
+        await backend.close()
+
+    with caplog.at_level("INFO", logger="app.core.cache"):
+        run(main())
+    assert [r.levelname for r in caplog.records] == ["WARNING", "INFO"]
+
+
+def test_close_waits_for_background_refreshes():
+    backend = make_cache()
+    finished = []
+
+    async def main():
+        async def refresh():
+            try:
+                await asyncio.sleep(10)
+            finally:
+                finished.append(True)
+
+        task = asyncio.create_task(refresh())
+        backend._background.add(task)
+        await asyncio.sleep(0)
+        await backend.close()
+        return task.cancelled(), list(finished)
+
+    assert run(main()) == (True, [True])
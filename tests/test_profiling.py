@@ -0,0 +1,21 @@
+from app.core.profiling import _START_MARKER, parse_importtime, profile_startup
+
+
+def test_parse_importtime_ignores_lines_before_marker():
+    output = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       500 |        900 | site",
+        _START_MARKER,
+        "import time:       120 |        120 |   json.decoder",
+        "import time:       300 |        420 | json",
+    ])
+    timings = parse_importtime(output)
+    assert [(t.module, t.self_us, t.cumulative_us) for t in timings] == [("json.decoder", 120, 120), ("json", 300, 420)]
+
+
+def test_profile_startup_only_reports_target_imports():
+    report = profile_startup("app.core.urls", top=50)
+    modules = {row["module"] for row in report["slowest_imports"]}
+    assert "app.core.urls" in modules
+    assert not modules & {"site", "encodings", "importlib", "resource"}
+    assert report["max_rss_mb"] > 0
@@ -0,0 +1,83 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.db import query_budget
+from app.db.query_budget import QueryBudgetExceeded, QueryBudgetMiddleware, instrument_engine
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    instrument_engine(engine)
+    return engine
+
+
+@pytest.fixture
+def client(engine):
+    app = FastAPI()
+    app.add_middleware(QueryBudgetMiddleware)
+
+    def run(statements):
+        with engine.connect() as conn:
+            for i in range(statements):
+                conn.execute(text(f"SELECT {i}"))
+
+    @app.get("/within")
+    @query_budget.query_budget(max_queries=2)
+    def within():
+        run(2)
+        return {}
+
+    @app.get("/over")
+    @query_budget.query_budget(max_queries=1)
+    def over():
+        run(3)
+        return {}
+
+    @app.get("/repeated")
+    def repeated():
+        with engine.connect() as conn:
+            for _ in range(query_budget.QUERY_REPEAT_THRESHOLD):
+                conn.execute(text("SELECT 1"))
+        return {}
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def raise_mode(monkeypatch):
+    monkeypatch.setattr(query_budget, "QUERY_BUDGET_MODE", {"headers", "raise"})
+
+
+def test_headers_report_statement_count(client, raise_mode):
+    response = client.get("/within")
+    assert response.status_code == 200
+    assert response.headers["X-DB-Query-Count"] == "2"
+    assert float(response.headers["X-DB-Time-Ms"]) >= 0
+
+
+def test_budget_from_decorator_raises_in_raise_mode(client, raise_mode):
+    with pytest.raises(QueryBudgetExceeded, match="3 statements"):
+        client.get("/over")
+
+
+def test_repeated_statement_is_flagged(client, raise_mode):
+    with pytest.raises(QueryBudgetExceeded, match="possible N\\+1"):
+        client.get("/repeated")
+
+
+def test_log_mode_only_warns(client, monkeypatch, caplog):
+    monkeypatch.setattr(query_budget, "QUERY_BUDGET_MODE", {"log"})
+    response = client.get("/over")
+    assert response.status_code == 200
+    assert "X-DB-Query-Count" not in response.headers
+    assert "Query budget exceeded" in caplog.text
+
+
+def test_statements_outside_requests_are_not_tracked(engine):
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert query_budget.current_stats() is None
@@ -0,0 +1,39 @@
+import pytest
+
+from app.core.urls import canonicalize_url, url_hash
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("http://Example.com/news/story/", "https://example.com/news/story"),
+    ("https://example.com/a?utm_source=x&b=2&fbclid=y&a=1#top", "https://example.com/a?a=1&b=2"),
+    ("https://example.com:443/a", "https://example.com/a"),
+    ("https://example.com:8080/a", "https://example.com:8080/a"),
+    ("https://example.com:0443/a", "https://example.com/a"),
+    ("https://example.com:08080/a", "https://example.com:8080/a"),
+    ("https://[::1]:8080/x", "https://[::1]:8080/x"),
+    ("https://user:pw@Example.com/x", "https://user:pw@example.com/x"),
+    (" http://[::1/a ", "http://[::1/a"),
+    ("https://example.com:99999/a", "https://example.com:99999/a"),
+])
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+@pytest.mark.parametrize("url", [
+    "http://[::1]:443/a?utm_medium=m&b=2",
+    "HTTP://User@Example.COM:80/p/",
+    "https://example.com",
+])
+def test_canonicalize_url_is_stable(url):
+    once = canonicalize_url(url)
+    assert canonicalize_url(once) == once
+
+
+def test_url_hash_matches_for_equivalent_urls():
+    assert url_hash("http://example.com/a/?utm_campaign=z") == url_hash("https://EXAMPLE.com/a")
+    assert url_hash("https://example.com/a") != url_hash("https://example.com/b")
+    assert -(2 ** 63) <= url_hash("https://example.com/a") < 2 ** 63
+
+
+def test_url_hash_accepts_malformed_urls():
+    assert url_hash("http://[::1/a") == url_hash("http://[::1/a ")